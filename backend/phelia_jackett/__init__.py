@@ -1,26 +1,80 @@
 from __future__ import annotations
 
+import asyncio
 import json
 import os
-from pathlib import Path
-from typing import Any, Dict, Optional
+from typing import Any, Callable, Dict, Iterator, Optional, Tuple
 
+from cachetools import TTLCache
 from fastapi import APIRouter
 
-from .torznab import TorznabClient
+from .torznab import TorznabClient, TorznabError
+
+try:
+    # Optional speedup: parses bytes directly, no separate decode pass
+    from orjson import loads as _json_loads
+except ImportError:  # pragma: no cover - stdlib fallback
+    _json_loads = json.loads
+
+__all__ = ["JackettSearchProvider", "Plugin", "TorznabClient", "TorznabError"]
 
 
 class JackettSearchProvider:
     """
     Adapter implementing your core's SearchProvider protocol:
       async def search(self, query: dict) -> list[dict]
+    Results are cached briefly per (title, media_type) so repeated or
+    concurrent identical queries hit Jackett only once.
+    search() raises TorznabError when Jackett answers with a Torznab <error>
+    document (e.g. invalid API key) instead of returning an empty list.
     """
 
-    def __init__(self, base_url: str, api_key: str) -> None:
-        self._client = TorznabClient(base_url=base_url, api_key=api_key)
+    CACHE_TTL_SECONDS = 30
+    CACHE_MAX_ENTRIES = 256
+
+    def __init__(
+        self,
+        base_url: str | None = None,
+        api_key: str | None = None,
+        *,
+        client: TorznabClient | None = None,
+    ) -> None:
+        # Reuse the plugin's client when given so caps check and search share one pool
+        if client is None:
+            if base_url is None or api_key is None:
+                raise TypeError("JackettSearchProvider requires base_url and api_key, or client=")
+            client = TorznabClient(base_url=base_url, api_key=api_key)
+        self._client = client
+        self._cache: TTLCache = TTLCache(maxsize=self.CACHE_MAX_ENTRIES, ttl=self.CACHE_TTL_SECONDS)
+        self._inflight: Dict[Tuple[str, Any], asyncio.Task] = {}
 
     async def search(self, query: Dict[str, Any]):
-        return await self._client.search(query)
+        key = ((query.get("title") or "").lower(), query.get("media_type"))
+        cached = self._cache.get(key)
+        if cached is None:
+            # Concurrent identical queries share one in-flight fetch and all get
+            # its result or its exception
+            task = self._inflight.get(key)
+            if task is None:
+                task = asyncio.create_task(self._fetch(key, query))
+                self._inflight[key] = task
+                task.add_done_callback(lambda t: self._forget_inflight(key, t))
+            # Shield so one cancelled caller doesn't cancel the fetch for the others
+            cached = await asyncio.shield(task)
+        # Copy each result so callers annotating/mutating them can't corrupt the cache
+        return [dict(r) for r in cached]
+
+    async def _fetch(self, key: Tuple[str, Any], query: Dict[str, Any]):
+        results = await self._client.search(query)
+        self._cache[key] = results
+        return results
+
+    def _forget_inflight(self, key: Tuple[str, Any], task: asyncio.Task) -> None:
+        if self._inflight.get(key) is task:
+            del self._inflight[key]
+        # Mark a failure as retrieved even if every awaiting caller was cancelled
+        if not task.cancelled():
+            task.exception()
 
 
 class Plugin:
@@ -31,6 +85,7 @@ class Plugin:
       - register_route(path: str, router: APIRouter)
       - register_search_provider(provider)
       - register_settings_panel(plugin_id: str, schema: dict)
+      - register_settings_panel_bytes(plugin_id: str, schema: bytes)  (optional, JSON-encoded)
       - settings_store (with get/set methods or callables)
       - notify(message: str)
     """
@@ -69,9 +124,20 @@ class Plugin:
         "required": ["base_url", "api_key"],
     }
 
+    # Serialized once at import for cores that accept a pre-encoded schema
+    _SCHEMA_BYTES = json.dumps(SETTINGS_SCHEMA, separators=(",", ":")).encode("utf-8")
+
     def __init__(self) -> None:
         self._ctx: Dict[str, Any] | None = None
         self._provider: JackettSearchProvider | None = None
+        self._client: TorznabClient | None = None
+        # Core callables resolved once per lifecycle hook by _bind_ctx()
+        self._read_settings: Callable[[], Dict[str, Any]] = lambda: {}
+        self._settings_set: Optional[Callable[..., Any]] = None
+        self._notify_fn: Optional[Callable[..., Any]] = None
+        self._reg_route: Optional[Callable[..., Any]] = None
+        self._reg_panel: Optional[Callable[..., Any]] = None
+        self._reg_panel_bytes: Optional[Callable[..., Any]] = None
         self._router = APIRouter()
 
         # Simple debug/health endpoint mounted under /plugins/{id}
@@ -88,8 +154,8 @@ class Plugin:
         - Import API key from Jackett's ServerConfig.json if the config dir is mounted.
         - Persist settings to the namespaced plugin settings store.
         """
-        self._ctx = ctx
-        settings = self._get_settings(ctx)
+        self._bind_ctx(ctx)
+        settings = self._get_settings()
 
         # Try to prefill base_url if missing
         if not settings.get("base_url"):
@@ -103,108 +169,137 @@ class Plugin:
                 settings["api_key"] = key
 
         # Persist possibly updated settings
-        self._save_settings(ctx, settings)
+        self._save_settings(settings)
 
         # Register settings panel on first install as well
-        self._register_settings_panel(ctx)
+        self._register_settings_panel()
 
         # Optionally notify UI
-        self._notify(ctx, "Jackett plugin installed. Configure API key in Settings if not auto-detected.")
+        self._notify("Jackett plugin installed. Configure API key in Settings if not auto-detected.")
 
         # Mount plugin router
-        self._register_routes(ctx)
+        self._register_routes()
 
     async def on_enable(self, ctx: Dict[str, Any]) -> None:
         """
         Validate configuration and register the SearchProvider with the core.
         """
-        self._ctx = ctx
-        settings = self._get_settings(ctx)
+        self._bind_ctx(ctx)
+        settings = self._get_settings()
         base = (settings.get("base_url") or "").strip()
         api_key = (settings.get("api_key") or "").strip()
 
         if not base or not api_key:
-            self._notify(ctx, "Jackett plugin not configured. Please set base URL and API key in Settings.")
+            self._notify("Jackett plugin not configured. Please set base URL and API key in Settings.")
             return
 
         client = TorznabClient(base_url=base, api_key=api_key)
-        ok = await client.caps_ok()
+        try:
+            ok = await client.caps_ok()
+        except Exception:
+            await client.aclose()
+            raise
         if not ok:
-            self._notify(ctx, "Jackett Torznab 'caps' check failed. Verify base URL and API key.")
+            await client.aclose()
+            self._notify("Jackett Torznab 'caps' check failed. Verify base URL and API key.")
             return
 
-        self._provider = JackettSearchProvider(base_url=base, api_key=api_key)
+        previous, self._client = self._client, client
+        self._provider = JackettSearchProvider(client=client)
         ctx["register_search_provider"](self._provider)
-        self._notify(ctx, "Jackett search provider enabled.")
+        # The old provider (if any) has been replaced, so its client can be closed now
+        if previous is not None:
+            await previous.aclose()
+        self._notify("Jackett search provider enabled.")
 
         # Mount routes if not yet mounted (idempotent)
-        self._register_routes(ctx)
-        self._register_settings_panel(ctx)
+        self._register_routes()
+        self._register_settings_panel()
 
-    def on_disable(self, ctx: Dict[str, Any]) -> None:
+    async def on_disable(self, ctx: Dict[str, Any]) -> None:
         """
-        No persistent hooks needed here; core should drop providers/routes for disabled plugins.
+        Close the shared HTTP client; core should drop providers/routes for disabled plugins.
         """
-        self._notify(ctx, "Jackett plugin disabled.")
+        self._bind_ctx(ctx)
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+        self._provider = None
+        self._notify("Jackett plugin disabled.")
 
     # ------------- helper methods -------------
 
-    def _get_settings(self, ctx: Dict[str, Any]) -> Dict[str, Any]:
+    def _bind_ctx(self, ctx: Dict[str, Any]) -> None:
         """
-        Read namespaced settings from the core-provided settings store.
-        The store may be an object with get/set, or callables in ctx.
+        Resolve the core-provided callables once per lifecycle hook so the helpers
+        below don't repeat ctx lookups and capability probes.
+        The settings store may be an object with get/set, or callables in ctx.
         """
+        self._ctx = ctx
+        ns = self.SETTINGS_NS
         store = ctx.get("settings_store")
-        if hasattr(store, "get"):
-            return dict(store.get(self.SETTINGS_NS) or {})
         get_fn = ctx.get("settings_get")
-        if callable(get_fn):
-            return dict(get_fn(self.SETTINGS_NS) or {})
-        return {}
+        if hasattr(store, "get"):
+            self._read_settings = lambda: dict(store.get(ns) or {})
+        elif callable(get_fn):
+            self._read_settings = lambda: dict(get_fn(ns) or {})
+        else:
+            self._read_settings = lambda: {}
+        self._settings_set = store.set if hasattr(store, "set") else _callable_or_none(ctx.get("settings_set"))
+        self._notify_fn = _callable_or_none(ctx.get("notify"))
+        self._reg_route = _callable_or_none(ctx.get("register_route"))
+        self._reg_panel = _callable_or_none(ctx.get("register_settings_panel"))
+        self._reg_panel_bytes = _callable_or_none(ctx.get("register_settings_panel_bytes"))
+
+    def _get_settings(self) -> Dict[str, Any]:
+        """
+        Read namespaced settings from the core-provided settings store.
+        """
+        return self._read_settings()
 
-    def _save_settings(self, ctx: Dict[str, Any], values: Dict[str, Any]) -> None:
+    def _save_settings(self, values: Dict[str, Any]) -> None:
         """
         Persist namespaced settings back to the store.
         """
-        store = ctx.get("settings_store")
-        if hasattr(store, "set"):
-            store.set(self.SETTINGS_NS, values)
-            return
-        set_fn = ctx.get("settings_set")
-        if callable(set_fn):
-            set_fn(self.SETTINGS_NS, values)
+        if self._settings_set is not None:
+            self._settings_set(self.SETTINGS_NS, values)
 
-    def _notify(self, ctx: Dict[str, Any], message: str) -> None:
+    def _notify(self, message: str) -> None:
         """
         Send a transient UI notification if available.
         """
-        notify = ctx.get("notify")
-        if callable(notify):
+        if self._notify_fn is not None:
             try:
-                notify(message)
+                self._notify_fn(message)
             except Exception:
                 pass
 
-    def _register_routes(self, ctx: Dict[str, Any]) -> None:
+    def _register_routes(self) -> None:
         """
         Mount this plugin's router under /plugins/{plugin_id}.
         The core is responsible for prefixing with the plugin id.
         """
-        register = ctx.get("register_route")
-        if callable(register):
+        if self._reg_route is not None:
             try:
-                register("/health", self._router)
+                self._reg_route("/health", self._router)
             except Exception:
                 pass
 
-    def _register_settings_panel(self, ctx: Dict[str, Any]) -> None:
+    def _register_settings_panel(self) -> None:
         """
         Tell the core to render our panel on the main Settings page.
+        Prefers the bytes variant when the core exposes it; otherwise hands over
+        the shared schema dict (never a copy).
         """
-        reg = ctx.get("register_settings_panel")
-        if callable(reg):
+        if self._reg_panel_bytes is not None:
+            try:
+                self._reg_panel_bytes(self.PLUGIN_ID, self._SCHEMA_BYTES)
+                return
+            except Exception:
+                pass
+        if self._reg_panel is not None:
             try:
-                reg(self.PLUGIN_ID, self.SETTINGS_SCHEMA)
+                self._reg_panel(self.PLUGIN_ID, self.SETTINGS_SCHEMA)
             except Exception:
                 pass
 
@@ -216,21 +311,39 @@ class Plugin:
           2) env JACKETT_CONFIG_DIR
           3) /config (common container default)
         """
-        mounts = ctx.get("mounts") or {}
-        candidates = [
-            mounts.get("jackett_config"),
-            os.environ.get("JACKETT_CONFIG_DIR"),
-            "/config",
-        ]
-        for root in [p for p in candidates if p]:
-            cfg = Path(root) / "Jackett" / "ServerConfig.json"
-            if cfg.exists():
-                try:
-                    data = json.loads(cfg.read_text(encoding="utf-8"))
-                    key = data.get("APIKey") or data.get("ApiKey") or data.get("api_key")
-                    if key and isinstance(key, str) and len(key) >= 8:
-                        return key
-                except Exception:
-                    continue
+        for root in self._config_dir_candidates(ctx):
+            cfg = os.path.join(root, "Jackett", "ServerConfig.json")
+            # Open directly instead of exists() + read; a missing file is the common case
+            try:
+                fd = os.open(cfg, os.O_RDONLY)
+            except OSError:
+                continue
+            try:
+                data = _json_loads(os.read(fd, 1 << 20))
+                key = data.get("APIKey") or data.get("ApiKey") or data.get("api_key")
+                if key and isinstance(key, str) and len(key) >= 8:
+                    return key
+            except Exception:
+                pass
+            finally:
+                os.close(fd)
+            # The first ServerConfig.json found is authoritative; skip later candidates
+            break
         return None
 
+    def _config_dir_candidates(self, ctx: Dict[str, Any]) -> Iterator[str]:
+        """
+        Yield Jackett config dirs in priority order; each source is only consulted
+        once the previous candidates had no ServerConfig.json.
+        """
+        root = (ctx.get("mounts") or {}).get("jackett_config")
+        if root:
+            yield root
+        root = os.environ.get("JACKETT_CONFIG_DIR")
+        if root:
+            yield root
+        yield "/config"
+
+
+def _callable_or_none(value: Any) -> Optional[Callable[..., Any]]:
+    return value if callable(value) else None
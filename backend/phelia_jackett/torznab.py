@@ -1,8 +1,69 @@
 from __future__ import annotations
 
-import httpx
-from typing import Any, Dict, List, Optional
-from xml.etree import ElementTree
+from types import ModuleType
+from typing import TYPE_CHECKING, Any, Dict, List, Optional
+
+if TYPE_CHECKING:
+    import httpx
+    from lxml import etree
+
+# httpx and lxml are imported on first use so that loading the plugin
+# (e.g. while it is still unconfigured) doesn't pay for them
+_httpx: ModuleType | None = None
+_etree: ModuleType | None = None
+
+
+def _lazy_httpx() -> ModuleType:
+    global _httpx
+    if _httpx is None:
+        import httpx
+
+        _httpx = httpx
+    return _httpx
+
+
+def _lazy_etree() -> ModuleType:
+    global _etree
+    if _etree is None:
+        from lxml import etree
+
+        _etree = etree
+    return _etree
+
+
+# How much of the caps document to sniff before deciding it is valid
+_CAPS_SNIFF_BYTES = 512
+
+# Read size when streaming search results into the parser
+_STREAM_CHUNK_BYTES = 64 * 1024
+
+# Torznab <error> documents put the element right after the XML declaration;
+# leave room for a BOM, a long declaration and line breaks
+_ERROR_SNIFF_BYTES = 256
+
+# Local tag names compared against parsed elements (namespace stripped for attr)
+_TAG_ITEM = "item"
+_TAG_TITLE = "title"
+_TAG_LINK = "link"
+_TAG_ENCLOSURE = "enclosure"
+_TAG_PUBDATE = "pubDate"
+_TAG_ATTR = "attr"
+
+# Result skeleton; copying it reuses the key table instead of rebuilding each dict
+_RESULT_TEMPLATE: Dict[str, Any] = {
+    "title": "",
+    "link": "",                          # magnet or torrent URL
+    "size_bytes": None,
+    "seeders": None,
+    "pubdate": None,
+    "provider": "jackett",
+}
+
+
+class TorznabError(Exception):
+    """
+    Jackett answered with a Torznab <error> document (e.g. invalid API key).
+    """
 
 
 class TorznabClient:
@@ -15,20 +76,74 @@ class TorznabClient:
     def __init__(self, base_url: str, api_key: str, timeout: float = 8.0) -> None:
         self.base_url = base_url.rstrip("/")
         self.api_key = api_key
+        # Endpoint and fixed query params never change for the client's lifetime
+        self._api_url = f"{self.base_url}/api"
+        self._caps_params = {"t": "caps", "apikey": api_key}
+        self._search_params_base = {"t": "search", "apikey": api_key}
         self._timeout = timeout
+        self._http: httpx.AsyncClient | None = None
+        self._closed = False
+
+    async def _client(self) -> httpx.AsyncClient:
+        """
+        Return the shared HTTP client, creating it on first use.
+        Keeping one client alive reuses the connection pool (and TLS sessions)
+        across caps checks and searches.
+        Raises RuntimeError after aclose() rather than silently opening a new pool.
+        """
+        if self._closed:
+            raise RuntimeError("TorznabClient has been closed")
+        if self._http is None or self._http.is_closed:
+            httpx = _lazy_httpx()
+            # Fail fast on an unreachable host; only the read budget gets the full timeout
+            timeout = httpx.Timeout(connect=1.0, read=self._timeout, write=2.0, pool=0.5)
+            # Pool/HTTP2 options live on the transport; retries cover transient connect errors
+            transport = httpx.AsyncHTTPTransport(
+                http2=True,
+                limits=httpx.Limits(max_keepalive_connections=10),
+                retries=1,
+            )
+            self._http = httpx.AsyncClient(timeout=timeout, transport=transport)
+        return self._http
+
+    async def aclose(self) -> None:
+        """
+        Close the shared HTTP client, if one was created. The client can't be reused.
+        """
+        self._closed = True
+        if self._http is not None:
+            await self._http.aclose()
+            self._http = None
 
     async def caps_ok(self) -> bool:
-        url = f"{self.base_url}/api?t=caps&apikey={self.api_key}"
-        async with httpx.AsyncClient(timeout=self._timeout) as http:
-            r = await http.get(url)
+        """
+        Health check: the caps document can list every indexer and be large,
+        so only its first bytes are read unless they are inconclusive.
+        """
+        http = await self._client()
+        async with http.stream("GET", self._api_url, params=self._caps_params) as r:
             if r.status_code != 200:
                 return False
-            # Basic XML parse sanity check
-            try:
-                ElementTree.fromstring(r.text.encode("utf-8"))
+            body = bytearray()
+            chunks = r.aiter_bytes()
+            async for chunk in chunks:
+                body += chunk
+                if len(body) >= _CAPS_SNIFF_BYTES:
+                    break
+            head = bytes(body[:_CAPS_SNIFF_BYTES])
+            if b"<?xml" in head and b"<caps" in head:
                 return True
-            except Exception:
+            if b"<error" in head:
                 return False
+            # Ambiguous prefix (no declaration, long leading comment, ...): parse it all
+            async for chunk in chunks:
+                body += chunk
+        try:
+            etree = _lazy_etree()
+            etree.fromstring(bytes(body), etree.XMLParser(resolve_entities=False))
+            return True
+        except Exception:
+            return False
 
     async def search(self, query: Dict[str, Any]) -> List[Dict[str, Any]]:
         """
@@ -39,48 +154,120 @@ class TorznabClient:
         if not q:
             return []
 
-        url = f"{self.base_url}/api?t=search&apikey={self.api_key}&q={q}"
+        # Let httpx percent-encode the query; titles may contain spaces, '&' or '#'
+        params = {**self._search_params_base, "q": q}
         results: List[Dict[str, Any]] = []
 
-        async with httpx.AsyncClient(timeout=self._timeout) as http:
-            r = await http.get(url)
+        http = await self._client()
+        # Feed the body to a pull parser as it arrives; items are consumed and
+        # discarded one by one instead of building the whole tree
+        # Drop comments/PIs like ElementTree does, so element text isn't split at them
+        parser = _lazy_etree().XMLPullParser(
+            events=("end",),
+            resolve_entities=False,
+            remove_comments=True,
+            remove_pis=True,
+        )
+        async with http.stream("GET", self._api_url, params=params) as r:
             r.raise_for_status()
-            root = ElementTree.fromstring(r.text.encode("utf-8"))
+            chunks = r.aiter_bytes(_STREAM_CHUNK_BYTES)
+            head = bytearray()
+            async for chunk in chunks:
+                head += chunk
+                if len(head) >= _ERROR_SNIFF_BYTES:
+                    break
+            if b"<error" in head[:_ERROR_SNIFF_BYTES]:
+                # Error documents are tiny: skip the pull parser and surface the description
+                async for chunk in chunks:
+                    head += chunk
+                raise _torznab_error(bytes(head))
+            parser.feed(bytes(head))
+            _drain_items(parser, results)
+            async for chunk in chunks:
+                parser.feed(chunk)
+                _drain_items(parser, results)
+        parser.close()
+        _drain_items(parser, results)
+        return results
 
-            for item in root.iter("item"):
-                title = (item.findtext("title") or "").strip()
-                link = (item.findtext("link") or "").strip()
-                enclosure = item.find("enclosure")
 
+def _drain_items(parser: etree.XMLPullParser, results: List[Dict[str, Any]]) -> None:
+    """
+    Consume finished <item> elements from the pull parser into results,
+    then free them (and any already-processed siblings) to keep memory flat.
+    """
+    for _event, elem in parser.read_events():
+        if elem.tag != _TAG_ITEM:
+            continue
+        results.append(_parse_item(elem))
+        elem.clear()
+        while elem.getprevious() is not None:
+            del elem.getparent()[0]
+
+
+def _torznab_error(body: bytes) -> TorznabError:
+    """
+    Build a TorznabError from an <error code=".." description=".."/> body.
+    """
+    etree = _lazy_etree()
+    try:
+        root = etree.fromstring(body, etree.XMLParser(resolve_entities=False))
+    except etree.XMLSyntaxError:
+        return TorznabError("Torznab error response")
+    return TorznabError(root.get("description") or f"Torznab error {root.get('code')}")
+
+
+def _parse_item(item: etree._Element) -> Dict[str, Any]:
+    """
+    Normalize one RSS/Torznab <item> into Phelia's result shape.
+    """
+    # One pass over the children: plain RSS elements by tag, torznab:attr inline
+    children: Dict[str, etree._Element] = {}
+    seeders = None
+    for child in item:
+        tag = child.tag
+        if not isinstance(tag, str):
+            # Comments / processing instructions
+            continue
+        ns, _, local = tag.rpartition("}")
+        if local == _TAG_ATTR:
+            # Torznab custom attrs (seeders, peers, etc.); a malformed duplicate
+            # must not discard a value already parsed
+            if child.get("name") == "seeders":
+                try:
+                    seeders = int(child.get("value"))
+                except (TypeError, ValueError):
+                    pass
+        elif not ns:
+            children.setdefault(local, child)
+
+    title = _child_text(children, _TAG_TITLE).strip()
+    link = _child_text(children, _TAG_LINK).strip()
+    pubdate = _child_text(children, _TAG_PUBDATE) if _TAG_PUBDATE in children else None
+
+    size = None
+    enclosure = children.get(_TAG_ENCLOSURE)
+    if enclosure is not None:
+        # Torznab sets length in bytes (optional)
+        try:
+            size = int(enclosure.get("length"))
+        except (TypeError, ValueError):
+            pass
+        else:
+            if size < 0:
                 size = None
-                if enclosure is not None:
-                    # Torznab sets length in bytes (optional)
-                    length = enclosure.attrib.get("length")
-                    if length and length.isdigit():
-                        size = int(length)
-                    # Prefer enclosure URL for magnet/torrent
-                    link = enclosure.attrib.get("url", link) or link
-
-                seeders = None
-                # Torznab custom attrs (seeders, peers, etc.)
-                for attr in item.findall("{*}attr"):
-                    if attr.attrib.get("name") == "seeders":
-                        try:
-                            seeders = int(attr.attrib.get("value", ""))
-                        except Exception:
-                            pass
-
-                pubdate = item.findtext("pubDate")
-
-                results.append(
-                    {
-                        "title": title,
-                        "link": link,                    # magnet or torrent URL
-                        "size_bytes": size,
-                        "seeders": seeders,
-                        "pubdate": pubdate,
-                        "provider": "jackett",
-                    }
-                )
-        return results
+        # Prefer enclosure URL for magnet/torrent
+        link = enclosure.get("url", link) or link
+
+    result = _RESULT_TEMPLATE.copy()
+    result["title"] = title
+    result["link"] = link
+    result["size_bytes"] = size
+    result["seeders"] = seeders
+    result["pubdate"] = pubdate
+    return result
+
 
+def _child_text(children: Dict[str, etree._Element], tag: str) -> str:
+    child = children.get(tag)
+    return (child.text or "") if child is not None else ""